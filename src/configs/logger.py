@@ -0,0 +1,27 @@
+import os
+import sys
+
+from loguru import logger
+
+
+def setup_logger(enqueue: bool = True):
+    """
+    Replaces loguru's default handler with the application's stderr sink.
+
+    With `enqueue=True` log calls only put the record on a queue and return,
+    and a background thread writes it to stderr. Backtrace and diagnose are
+    disabled because walking frames for every record dominates the cost of
+    loguru's logging path.
+
+    Args:
+        enqueue: Whether records are written by a background thread.
+            Defaults to True.
+    """
+    logger.remove()
+    logger.add(
+        sys.stderr,
+        level=os.getenv("LOG_LEVEL") or "INFO",
+        enqueue=enqueue,
+        backtrace=False,
+        diagnose=False,
+    )
@@ -1,97 +1,115 @@
-import os
+import copy
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-import boto3
 from loguru import logger
 
+from configs.tools.aws import session
+from configs.tools.aws.session import MAX_POOL_CONNECTIONS, create_client
+
+MAX_TRANSFER_WORKERS = 32
+
+_s3 = None
+_s3_lock = threading.Lock()
+
 
 class AWSS3:
     """
     Manages interactions with AWS S3 buckets, including uploading, downloading,
-    and deleting files. Implements a Singleton pattern and uses loguru for logging.
+    and deleting files. Clients are created from the process-wide boto3
+    session. Uses loguru for logging.
     """
 
-    _instance = None
-
-    def __new__(cls, access_key=None, secret_key=None, region_name=None):
+    def __init__(self, access_key=None, secret_key=None, region_name=None):
         """
-        Implements the Singleton pattern for the AWSS3 class.
-        Initializes the Boto3 S3 client upon the first instance creation.
+        Initializes the AWSS3 manager and its Boto3 S3 client.
 
         Args:
             access_key: AWS access key ID. Defaults to None, checks environment variable.
             secret_key: AWS secret access key. Defaults to None, checks environment variable.
             region_name: AWS region name. Defaults to None, checks environment variable.
 
-        Returns:
-            The single instance of the AWSS3 class.
-
         Raises:
-            ValueError: If AWS credentials are not provided via arguments or environment variables
-                        during the first instance creation.
-            Exception: If Boto3 S3 client initialization fails during the first instance creation.
-        """
-        if cls._instance is None:
-            logger.info("Creating the first instance of AWSS3.")
-            cls._instance = super().__new__(cls)
-
-            if (
-                not cls._instance.check_environment_variables()
-                and access_key is None
-                and secret_key is None
-                and region_name is None
-            ):
-                logger.error(
-                    "AWS credentials were not provided via arguments or environment variables."
-                )
-                raise ValueError("AWS credentials were not provided.")
-
-            cls._instance.access_key = access_key or os.getenv("AWS_ACCESS_KEY_ID")
-            cls._instance.secret_key = secret_key or os.getenv("AWS_SECRET_ACCESS_KEY")
-            cls._instance.region_name = region_name or os.getenv("AWS_REGION")
-
-            if not cls._instance.access_key or not cls._instance.secret_key:
-                logger.error(
-                    "AWS access key or secret key is missing after checking all sources."
-                )
-                raise ValueError("AWS credentials were not provided.")
-
-            logger.info("AWS credentials loaded successfully.")
-            logger.info(f"Using region: {cls._instance.region_name}")
-
-            try:
-                cls._instance.s3 = boto3.client(
-                    "s3",
-                    aws_access_key_id=cls._instance.access_key,
-                    aws_secret_access_key=cls._instance.secret_key,
-                    region_name=cls._instance.region_name,
-                )
-                logger.info("Boto3 S3 client initialized successfully.")
-            except Exception as e:
-                logger.error(f"Error initializing Boto3 S3 client: {e}")
-                cls._instance = None
-                raise
-        else:
-            logger.info("Returning existing instance of AWSS3.")
-
-        return cls._instance
-
-    # Dentro do arquivo configs/tools/aws/s3.py, na classe AWSS3
-
-    def download_file_from_s3(self, bucket_name: str, key: str, local_file_path: str):
+            ValueError: If AWS credentials are not provided via arguments or environment variables.
+            Exception: If Boto3 S3 client initialization fails.
+        """
+        if (
+            not session.ENV_VARS_SET
+            and access_key is None
+            and secret_key is None
+            and region_name is None
+        ):
+            logger.error(
+                "AWS credentials were not provided via arguments or environment variables."
+            )
+            raise ValueError("AWS credentials were not provided.")
+
+        self.access_key = access_key or session.AWS_ACCESS_KEY_ID
+        self.secret_key = secret_key or session.AWS_SECRET_ACCESS_KEY
+        self.region_name = region_name or session.AWS_REGION
+
+        if not self.access_key or not self.secret_key:
+            logger.error(
+                "AWS access key or secret key is missing after checking all sources."
+            )
+            raise ValueError("AWS credentials were not provided.")
+
+        logger.info("AWS credentials loaded successfully.")
+        logger.info(f"Using region: {self.region_name}")
+
+        try:
+            from boto3.s3.transfer import TransferConfig
+            from botocore.config import Config
+
+            self.s3 = create_client(
+                "s3",
+                aws_access_key_id=self.access_key,
+                aws_secret_access_key=self.secret_key,
+                region_name=self.region_name,
+                config=Config(max_pool_connections=MAX_POOL_CONNECTIONS),
+            )
+            self.transfer_config = TransferConfig(
+                multipart_threshold=5 * 1024 * 1024,
+                multipart_chunksize=8 * 1024 * 1024,
+                max_concurrency=16,
+                use_threads=True,
+            )
+            logger.info("Boto3 S3 client initialized successfully.")
+        except Exception as e:
+            logger.error(f"Error initializing Boto3 S3 client: {e}")
+            raise
+
+    def download_file_from_s3(
+        self, bucket_name: str, key: str, local_file_path: str, config=None
+    ) -> bool:
         """
         Downloads a file from an S3 bucket to a local path.
 
+        Files larger than the multipart threshold are fetched with parallel
+        ranged GETs. The transfer manager writes to a temporary file and
+        renames it into place, so a failed download never leaves a partial
+        file at `local_file_path`.
+
         Args:
             bucket_name: The name of the S3 bucket.
             key: The key (path) of the file in the S3 bucket.
             local_file_path: The local path to save the downloaded file.
+            config: TransferConfig to use instead of the manager's default.
+
+        Returns:
+            True if the download is successful, False otherwise.
         """
         logger.info(
             f"Attempting to download file from s3://{bucket_name}/{key} to {local_file_path}"
         )
         try:
-            with open(local_file_path, "wb") as f:
-                self.s3.download_fileobj(bucket_name, key, f)
+            self.s3.download_file(
+                bucket_name,
+                key,
+                local_file_path,
+                Config=config or self.transfer_config,
+            )
             logger.info(f"Successfully downloaded file to {local_file_path}")
             return True
         except Exception as e:
@@ -100,8 +118,36 @@ class AWSS3:
             )
             return False
 
+    def download_file_to_bytes(self, bucket_name: str, key: str) -> io.BytesIO | None:
+        """
+        Downloads a file from an S3 bucket into an in-memory buffer.
+
+        Args:
+            bucket_name: The name of the S3 bucket.
+            key: The key (path) of the file in the S3 bucket.
+
+        Returns:
+            A BytesIO positioned at the start of the file content, or None on error.
+        """
+        logger.info(
+            f"Attempting to download file from s3://{bucket_name}/{key} to memory"
+        )
+        try:
+            buffer = io.BytesIO()
+            self.s3.download_fileobj(
+                bucket_name, key, buffer, Config=self.transfer_config
+            )
+            buffer.seek(0)
+            logger.info(
+                f"Successfully downloaded {buffer.getbuffer().nbytes} bytes from s3://{bucket_name}/{key}"
+            )
+            return buffer
+        except Exception as e:
+            logger.error(f"Error downloading file from s3://{bucket_name}/{key}: {e}")
+            return None
+
     def upload_file_to_s3(
-        self, bucket_name: str, key: str, local_file_path: str
+        self, bucket_name: str, key: str, local_file_path: str, config=None
     ) -> bool:
         """
         Uploads a local file to an S3 bucket.
@@ -110,6 +156,7 @@ class AWSS3:
             bucket_name: The name of the S3 bucket.
             key: The key (path) to save the file in the S3 bucket.
             local_file_path: The local path of the file to upload.
+            config: TransferConfig to use instead of the manager's default.
 
         Returns:
             True if the upload is successful, False otherwise.
@@ -118,7 +165,12 @@ class AWSS3:
             f"Attempting to upload file from {local_file_path} to s3://{bucket_name}/{key}"
         )
         try:
-            self.s3.upload_file(local_file_path, bucket_name, key)
+            self.s3.upload_file(
+                local_file_path,
+                bucket_name,
+                key,
+                Config=config or self.transfer_config,
+            )
             logger.info(f"Successfully uploaded file to s3://{bucket_name}/{key}")
             return True
         except Exception as e:
@@ -127,6 +179,67 @@ class AWSS3:
             )
             return False
 
+    def download_files_from_s3(self, files: list[tuple[str, str, str]]) -> list[bool]:
+        """
+        Downloads several files from S3 concurrently using the shared client.
+
+        Args:
+            files: A list of (bucket_name, key, local_file_path) tuples.
+
+        Returns:
+            A list with the result of each download, in the same order as `files`.
+        """
+        return self._run_transfers(self.download_file_from_s3, files)
+
+    def upload_files_to_s3(self, files: list[tuple[str, str, str]]) -> list[bool]:
+        """
+        Uploads several local files to S3 concurrently using the shared client.
+
+        Args:
+            files: A list of (bucket_name, key, local_file_path) tuples.
+
+        Returns:
+            A list with the result of each upload, in the same order as `files`.
+        """
+        return self._run_transfers(self.upload_file_to_s3, files)
+
+    def _run_transfers(self, transfer, files: list[tuple[str, str, str]]) -> list[bool]:
+        """
+        Runs a single-file transfer method over a thread pool.
+
+        A failed transfer does not stop the others; each result is collected
+        as soon as it completes. The multipart concurrency of each transfer is
+        reduced so that all workers together stay within the client's
+        MAX_POOL_CONNECTIONS connections.
+        """
+        if not files:
+            return []
+
+        max_workers = min(MAX_TRANSFER_WORKERS, MAX_POOL_CONNECTIONS, len(files))
+        config = copy.copy(self.transfer_config)
+        config.max_concurrency = max(
+            1, min(config.max_concurrency, MAX_POOL_CONNECTIONS // max_workers)
+        )
+        logger.info(
+            f"Starting {len(files)} S3 transfers with {max_workers} workers "
+            f"and {config.max_concurrency} connections each."
+        )
+        results = [False] * len(files)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(transfer, *file, config=config): index
+                for index, file in enumerate(files)
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    results[index] = future.result()
+                except Exception as e:
+                    logger.error(f"S3 transfer failed for {files[index]}: {e}")
+
+        logger.info(f"Completed {sum(results)} of {len(files)} S3 transfers.")
+        return results
+
     def delete_file_from_s3(self, bucket_name: str, key: str):
         """
         Deletes a file from an S3 bucket.
@@ -142,35 +255,22 @@ class AWSS3:
         except Exception as e:
             logger.error(f"Error deleting file s3://{bucket_name}/{key}: {e}")
 
-    @staticmethod
-    def check_environment_variables() -> bool:
-        """
-        Checks if required AWS environment variables are set.
 
-        Returns:
-            True if AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, and AWS_REGION are set, False otherwise.
-        """
-        logger.info(
-            "Checking for AWS environment variables (AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, AWS_REGION)."
-        )
-        access_key_set = os.getenv("AWS_ACCESS_KEY_ID") is not None
-        secret_key_set = os.getenv("AWS_SECRET_ACCESS_KEY") is not None
-        region_set = os.getenv("AWS_REGION") is not None
-
-        if not access_key_set or not secret_key_set or not region_set:
-            missing_vars = [
-                var
-                for var, is_set in [
-                    ("AWS_ACCESS_KEY_ID", access_key_set),
-                    ("AWS_SECRET_ACCESS_KEY", secret_key_set),
-                    ("AWS_REGION", region_set),
-                ]
-                if not is_set
-            ]
-            logger.warning(
-                f"Missing required AWS environment variables: {', '.join(missing_vars)}"
-            )
-            return False
-        else:
-            logger.info("Required AWS environment variables configured correctly.")
-            return True
+def get_s3():
+    """
+    Returns the AWSS3 manager shared by the whole process.
+
+    The manager is built on first use from the settings in `session`, so
+    extractors that never download a file do not create an S3 client. It is
+    rebuilt if `session.reload_env` picked up different credentials.
+    """
+    global _s3
+    settings = (
+        session.AWS_ACCESS_KEY_ID,
+        session.AWS_SECRET_ACCESS_KEY,
+        session.AWS_REGION,
+    )
+    with _s3_lock:
+        if _s3 is None or (_s3.access_key, _s3.secret_key, _s3.region_name) != settings:
+            _s3 = AWSS3()
+    return _s3
@@ -0,0 +1,91 @@
+import os
+import threading
+
+from loguru import logger
+
+MAX_POOL_CONNECTIONS = 64
+_REQUIRED_ENV_VARS = ("AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY", "AWS_REGION")
+
+_session = None
+_session_lock = threading.Lock()
+_client_lock = threading.Lock()
+
+
+def check_environment_variables() -> bool:
+    """
+    Checks if required AWS environment variables are set.
+
+    Returns:
+        True if AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, and AWS_REGION are set, False otherwise.
+    """
+    logger.debug(
+        "Checking for AWS environment variables (AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, AWS_REGION)."
+    )
+    missing_vars = [var for var in _REQUIRED_ENV_VARS if not os.environ.get(var)]
+
+    if missing_vars:
+        logger.warning(
+            f"Missing required AWS environment variables: {', '.join(missing_vars)}"
+        )
+        return False
+    else:
+        logger.debug("Required AWS environment variables configured correctly.")
+        return True
+
+
+def reload_env():
+    """
+    Reads the AWS settings from the environment into module-level constants.
+
+    Settings are read once at import; clients and listeners constructed later
+    only reference these values instead of probing the environment again.
+    Call this after changing os.environ (e.g. in tests) so that objects
+    created afterwards see the new values.
+    """
+    global ENV_VARS_SET, AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, AWS_REGION
+    global AWS_BUCKET, QUEUE_NAME
+
+    ENV_VARS_SET = check_environment_variables()
+    AWS_ACCESS_KEY_ID = os.environ.get("AWS_ACCESS_KEY_ID")
+    AWS_SECRET_ACCESS_KEY = os.environ.get("AWS_SECRET_ACCESS_KEY")
+    AWS_REGION = os.environ.get("AWS_REGION")
+    AWS_BUCKET = os.environ.get("AWS_BUCKET")
+    QUEUE_NAME = os.environ.get("QUEUE_NAME")
+
+
+reload_env()
+
+
+def get_session():
+    """
+    Returns the boto3 session shared by every AWS client in the process.
+
+    boto3 is imported on the first call, so modules that never talk to AWS
+    do not pay its import cost. Clients created from the same session reuse
+    its loaded service models, and the clients themselves are safe to share
+    between threads.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                import boto3
+
+                _session = boto3.session.Session()
+    return _session
+
+
+def create_client(service_name: str, **kwargs):
+    """
+    Creates a boto3 client from the shared session.
+
+    boto3 sessions are not safe for concurrent client creation, so every
+    client in the process is created through this function, under one lock.
+    The clients themselves can be used from any thread.
+
+    Args:
+        service_name: The AWS service, e.g. "s3" or "sqs".
+        **kwargs: Extra arguments passed to `Session.client`.
+    """
+    with _client_lock:
+        return get_session().client(service_name, **kwargs)
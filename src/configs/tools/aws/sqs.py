@@ -1,13 +1,46 @@
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
 
-import boto3
+from botocore.exceptions import BotoCoreError, ClientError
 from loguru import logger
 
+from configs.tools.aws import session
+from configs.tools.aws.session import MAX_POOL_CONNECTIONS, create_client
+
+LONG_POLL_WAIT_SECONDS = min(int(os.getenv("SQS_WAIT_TIME_SECONDS") or 20), 20)
+SQS_BATCH_SIZE = 10
+SQS_RECEIVE_FANOUT = int(os.getenv("SQS_RECEIVE_FANOUT") or 4)
+
+# Error codes SQS returns for a missing queue (query and JSON protocols) and
+# for throttling. Throttled calls are retried after botocore's own retries
+# with an exponential backoff capped at MAX_THROTTLE_BACKOFF_SECONDS.
+MISSING_QUEUE_ERROR_CODES = frozenset(
+    {"QueueDoesNotExist", "AWS.SimpleQueueService.NonExistentQueue"}
+)
+THROTTLING_ERROR_CODES = frozenset(
+    {"Throttling", "ThrottlingException", "RequestThrottled", "RequestLimitExceeded"}
+)
+MAX_THROTTLE_RETRIES = 5
+MAX_THROTTLE_BACKOFF_SECONDS = 30
+
+# Adaptive retries back off on SQS throttling, and the pool is large enough
+# for the listener worker threads.
+SQS_CLIENT_CONFIG = {
+    "read_timeout": LONG_POLL_WAIT_SECONDS + 10,
+    "max_pool_connections": MAX_POOL_CONNECTIONS,
+    "retries": {"mode": "adaptive", "max_attempts": 10},
+    "tcp_keepalive": True,
+}
+
 
 class AWSSQSManager:
     """
     Manages interactions with AWS SQS queues, including getting queue URLs,
-    receiving, checking, and deleting messages. Uses loguru for logging.
+    receiving, checking, and deleting messages. The boto3 client is created
+    on first use. Uses loguru for logging.
     """
 
     def __init__(
@@ -26,12 +59,11 @@ class AWSSQSManager:
 
         Raises:
             ValueError: If AWS credentials are not provided via arguments or environment variables.
-            Exception: If Boto3 SQS client initialization fails.
         """
         logger.info("Initializing AWSSQSManager.")
 
         if (
-            not self.check_environment_variables()
+            not session.ENV_VARS_SET
             and access_key is None
             and secret_key is None
             and region_name is None
@@ -39,9 +71,9 @@ class AWSSQSManager:
             logger.error("AWS credentials were not provided.")
             raise ValueError("AWS credentials were not provided.")
 
-        self.access_key = access_key or os.getenv("AWS_ACCESS_KEY_ID")
-        self.secret_key = secret_key or os.getenv("AWS_SECRET_ACCESS_KEY")
-        self.region_name = region_name or os.getenv("AWS_REGION")
+        self.access_key = access_key or session.AWS_ACCESS_KEY_ID
+        self.secret_key = secret_key or session.AWS_SECRET_ACCESS_KEY
+        self.region_name = region_name or session.AWS_REGION
 
         if not self.access_key or not self.secret_key:
             logger.error(
@@ -51,165 +83,370 @@ class AWSSQSManager:
 
         logger.info("AWS credentials loaded successfully.")
 
-        try:
-            self.sqs = boto3.client(
-                "sqs",
-                aws_access_key_id=self.access_key,
-                aws_secret_access_key=self.secret_key,
-                region_name=self.region_name,
-            )
-            logger.info("Boto3 SQS client initialized successfully.")
-        except Exception as e:
-            logger.error(f"Error initializing Boto3 SQS client: {e}")
-            raise
+        self._url_cache: dict[str, str] = {}
+        self._receive_pool = ThreadPoolExecutor(
+            max_workers=SQS_RECEIVE_FANOUT, thread_name_prefix="sqs-receive"
+        )
+        self._init_lock = threading.Lock()
+
+    @cached_property
+    def sqs(self):
+        """
+        The boto3 SQS client, created on first access.
+
+        Constructing the client loads botocore's service models, so managers
+        that never talk to SQS do not pay for it. The lock only keeps threads
+        of one manager from building two clients; `create_client` serializes
+        client creation across the process.
+
+        Raises:
+            Exception: If Boto3 SQS client initialization fails.
+        """
+        with self._init_lock:
+            if "sqs" in self.__dict__:
+                return self.__dict__["sqs"]
+            try:
+                from botocore.config import Config
+
+                client = create_client(
+                    "sqs",
+                    aws_access_key_id=self.access_key,
+                    aws_secret_access_key=self.secret_key,
+                    region_name=self.region_name,
+                    config=Config(**SQS_CLIENT_CONFIG),
+                )
+                logger.info("Boto3 SQS client initialized successfully.")
+                return client
+            except Exception as e:
+                logger.error(f"Error initializing Boto3 SQS client: {e}")
+                raise
 
     def get_queue_url(self, queue_name: str) -> str | None:
         """
         Gets the URL for a given SQS queue name.
 
+        Queue URLs do not change for the lifetime of a queue, so they are
+        cached per queue name and only resolved through SQS on a cache miss.
+
         Args:
             queue_name: The name of the SQS queue.
 
         Returns:
             The queue URL if successful, otherwise None.
         """
-        logger.info(f"Attempting to get URL for queue: {queue_name}")
+        queue_url = self._url_cache.get(queue_name)
+        if queue_url:
+            return queue_url
+
+        logger.debug("Attempting to get URL for queue: {}", queue_name)
         try:
             response = self.sqs.get_queue_url(QueueName=queue_name)
             queue_url = response["QueueUrl"]
-            logger.info(
-                f"Successfully retrieved URL for queue {queue_name}: {queue_url}"
+            self._url_cache[queue_name] = queue_url
+            logger.debug(
+                "Successfully retrieved URL for queue {}: {}", queue_name, queue_url
             )
             return queue_url
-        except Exception as e:
+        except (BotoCoreError, ClientError) as e:
             logger.error(f"Error getting queue URL for {queue_name}: {e}")
             return None
 
+    def _call_with_queue_url(self, queue_name: str, operation: str, **kwargs):
+        """
+        Calls an SQS client operation using the cached URL of a queue.
+
+        If SQS reports that the queue does not exist, the cached URL is
+        evicted and the call is retried once with a freshly resolved URL.
+        Throttled calls are retried with exponential backoff.
+
+        Args:
+            queue_name: The name of the SQS queue.
+            operation: The name of the boto3 SQS client method to call.
+            **kwargs: Extra arguments passed to the client method.
+
+        Returns:
+            The client response, or None if the queue URL could not be resolved.
+
+        Raises:
+            botocore.exceptions.ClientError: For any other error, or once the
+                                             retries are exhausted.
+        """
+        url_refreshed = False
+        for attempt in range(MAX_THROTTLE_RETRIES + 1):
+            queue_url = self.get_queue_url(queue_name)
+            if not queue_url:
+                return None
+            try:
+                return getattr(self.sqs, operation)(QueueUrl=queue_url, **kwargs)
+            except ClientError as e:
+                code = e.response["Error"]["Code"]
+                if code in MISSING_QUEUE_ERROR_CODES:
+                    self._url_cache.pop(queue_name, None)
+                    if url_refreshed:
+                        raise
+                    url_refreshed = True
+                    logger.warning(
+                        f"Cached URL for queue {queue_name} is stale. Resolving it again."
+                    )
+                elif code in THROTTLING_ERROR_CODES and attempt < MAX_THROTTLE_RETRIES:
+                    delay = min(MAX_THROTTLE_BACKOFF_SECONDS, 2**attempt)
+                    logger.warning(
+                        f"{operation} on queue {queue_name} was throttled ({code}). "
+                        f"Retrying in {delay} seconds."
+                    )
+                    time.sleep(delay)
+                else:
+                    raise
+
     def receive_messages_from_queue(
         self,
         queue_name: str,
         max_number_of_messages: int = 10,
         visibility_timeout: int = 30,
+        wait_time_seconds: int = LONG_POLL_WAIT_SECONDS,
+        message_attribute_names: list[str] | None = None,
     ) -> list:
         """
-        Receives messages from an SQS queue.
+        Receives messages from an SQS queue using long polling.
 
         Args:
             queue_name: The name of the SQS queue.
             max_number_of_messages: The maximum number of messages to retrieve (up to 10).
             visibility_timeout: The duration (in seconds) that the received messages
                                 are hidden from subsequent retrieve requests.
+            wait_time_seconds: How long (in seconds, up to 20) SQS waits for a message
+                               to arrive before returning an empty response.
+            message_attribute_names: Custom message attributes to return. Defaults to
+                                     none; pass ["All"] only when the consumer uses them.
 
         Returns:
             A list of received messages, or an empty list if an error occurs or no messages are available.
         """
-        logger.info(f"Attempting to receive messages from queue: {queue_name}")
+        logger.debug("Attempting to receive messages from queue: {}", queue_name)
         try:
-            queue_url = self.get_queue_url(queue_name)
-            if not queue_url:
+            response = self._call_with_queue_url(
+                queue_name,
+                "receive_message",
+                MaxNumberOfMessages=max_number_of_messages,
+                VisibilityTimeout=visibility_timeout,
+                WaitTimeSeconds=wait_time_seconds,
+                MessageSystemAttributeNames=["ApproximateReceiveCount"],
+                MessageAttributeNames=message_attribute_names or [],
+            )
+            if response is None:
                 logger.warning(
                     f"Could not get queue URL for {queue_name}. Cannot receive messages."
                 )
                 return []
 
-            response = self.sqs.receive_message(
-                QueueUrl=queue_url,
-                MaxNumberOfMessages=max_number_of_messages,
-                VisibilityTimeout=visibility_timeout,
-                WaitTimeSeconds=0,
-            )
             messages = response.get("Messages", [])
-            logger.info(f"Received {len(messages)} messages from queue: {queue_name}")
+            logger.opt(lazy=True).debug(
+                "Received {} messages from queue: {}",
+                lambda: len(messages),
+                lambda: queue_name,
+            )
             return messages
-        except Exception as e:
+        except (BotoCoreError, ClientError) as e:
             logger.error(f"Error receiving messages from queue {queue_name}: {e}")
             return []
 
-    def check_message_in_queue(self, queue_name: str) -> bool:
+    def receive_messages_parallel(
+        self,
+        queue_name: str,
+        fanout: int = SQS_RECEIVE_FANOUT,
+        max_messages: int | None = None,
+        **kwargs,
+    ) -> list:
         """
-        Checks if there are any messages in the SQS queue.
+        Receives messages with several concurrent ReceiveMessage calls.
+
+        A single call returns at most 10 messages, so issuing `fanout` calls at
+        once lets a busy queue hand over up to 10 * fanout messages per round
+        trip. Calls beyond SQS_RECEIVE_FANOUT wait for a free receive thread.
 
         Args:
             queue_name: The name of the SQS queue.
+            fanout: The maximum number of concurrent ReceiveMessage calls.
+            max_messages: Upper bound on the messages received in total, e.g.
+                          the number of idle workers. Defaults to 10 * fanout.
+            **kwargs: Extra arguments passed to receive_messages_from_queue.
 
         Returns:
-            True if there are approximate messages in the queue, False otherwise or on error.
+            The messages from all calls combined, or an empty list if none arrived.
         """
-        logger.info(f"Attempting to check message count in queue: {queue_name}")
+        if max_messages is None:
+            max_messages = SQS_BATCH_SIZE * fanout
+        batch_sizes = [
+            min(SQS_BATCH_SIZE, max_messages - start)
+            for start in range(0, max_messages, SQS_BATCH_SIZE)
+        ][: max(fanout, 1)]
+        if not batch_sizes:
+            return []
+
+        if len(batch_sizes) == 1:
+            return self.receive_messages_from_queue(
+                queue_name, max_number_of_messages=batch_sizes[0], **kwargs
+            )
+
+        futures = [
+            self._receive_pool.submit(
+                self.receive_messages_from_queue,
+                queue_name,
+                max_number_of_messages=batch_size,
+                **kwargs,
+            )
+            for batch_size in batch_sizes
+        ]
+        return [message for future in futures for message in future.result()]
+
+    def get_approximate_message_count(self, queue_name: str) -> int | None:
+        """
+        Gets the approximate number of visible messages in the SQS queue.
+
+        ReceiveMessage does not report queue depth, so this costs a separate
+        GetQueueAttributes request. Use it for health checks and scaling
+        decisions, not inside the polling loop.
+
+        Args:
+            queue_name: The name of the SQS queue.
+
+        Returns:
+            The approximate number of messages, or None on error.
+        """
+        logger.debug("Attempting to check message count in queue: {}", queue_name)
         try:
-            queue_url = self.get_queue_url(queue_name)
-            if not queue_url:
+            response = self._call_with_queue_url(
+                queue_name,
+                "get_queue_attributes",
+                AttributeNames=["ApproximateNumberOfMessages"],
+            )
+            if response is None:
                 logger.warning(
                     f"Could not get queue URL for {queue_name}. Cannot check message count."
                 )
-                return False
+                return None
 
-            response = self.sqs.get_queue_attributes(
-                QueueUrl=queue_url,
-                AttributeNames=["ApproximateNumberOfMessages"],
-            )
-            approximate_number_of_messages = response.get("Attributes", {}).get(
-                "ApproximateNumberOfMessages", "N/A"
-            )
+            count = response.get("Attributes", {}).get("ApproximateNumberOfMessages")
             logger.info(
-                f"Approximate number of messages in queue {queue_name}: {approximate_number_of_messages}"
+                f"Approximate number of messages in queue {queue_name}: {count}"
             )
-            if (
-                approximate_number_of_messages != "N/A"
-                and int(approximate_number_of_messages) > 0
-            ):
-                return True
-            return False
-        except Exception as e:
+            return int(count) if count is not None else None
+        except (BotoCoreError, ClientError) as e:
             logger.error(f"Error checking messages in queue {queue_name}: {e}")
-            return False
+            return None
 
-    def delete_message_from_queue(self, queue_name: str, receipt_handle: str):
+    def check_message_in_queue(self, queue_name: str) -> bool:
         """
-        Deletes a message from an SQS queue using its receipt handle.
+        Checks if there are any messages in the SQS queue.
+
+        Intended as a health check. Polling loops should call
+        receive_messages_from_queue directly and treat an empty result as
+        "no work" instead of checking first.
 
         Args:
             queue_name: The name of the SQS queue.
-            receipt_handle: The receipt handle of the message to delete.
+
+        Returns:
+            True if there are approximate messages in the queue, False otherwise or on error.
+        """
+        return bool(self.get_approximate_message_count(queue_name))
+
+    def extend_visibility(
+        self, queue_name: str, receipt_handle: str, seconds: int
+    ) -> bool:
+        """
+        Resets the visibility timeout of a received message.
+
+        Long-running handlers call this periodically so the message is not
+        redelivered to another consumer while it is still being processed.
+
+        Args:
+            queue_name: The name of the SQS queue.
+            receipt_handle: The receipt handle of the message.
+            seconds: The new visibility timeout, counted from now.
+
+        Returns:
+            True if the timeout was changed, False otherwise.
         """
-        logger.info(
-            f"Attempting to delete message from queue: {queue_name} with receipt handle: {receipt_handle}"
-        )
         try:
-            queue_url = self.get_queue_url(queue_name)
-            if not queue_url:
+            response = self._call_with_queue_url(
+                queue_name,
+                "change_message_visibility",
+                ReceiptHandle=receipt_handle,
+                VisibilityTimeout=seconds,
+            )
+            if response is None:
                 logger.warning(
-                    f"Could not get queue URL for {queue_name}. Cannot delete message."
+                    f"Could not get queue URL for {queue_name}. Cannot extend visibility."
                 )
-                return
+                return False
 
-            self.sqs.delete_message(QueueUrl=queue_url, ReceiptHandle=receipt_handle)
-            logger.info(
-                f"Message deleted successfully from queue {queue_name} with receipt handle: {receipt_handle}."
-            )
-        except Exception as e:
-            logger.error(f"Error deleting message from queue {queue_name}: {e}")
+            logger.debug("Extended message visibility by {} seconds.", seconds)
+            return True
+        except (BotoCoreError, ClientError) as e:
+            logger.error(f"Error extending message visibility in {queue_name}: {e}")
+            return False
+
+    def delete_message_from_queue(self, queue_name: str, receipt_handle: str):
+        """
+        Deletes a message from an SQS queue using its receipt handle.
+
+        Args:
+            queue_name: The name of the SQS queue.
+            receipt_handle: The receipt handle of the message to delete.
+        """
+        self.delete_messages_from_queue(queue_name, [receipt_handle])
 
-    @staticmethod
-    def check_environment_variables() -> bool:
+    def delete_messages_from_queue(
+        self, queue_name: str, receipt_handles: list[str]
+    ) -> list[str]:
         """
-        Checks if required AWS environment variables are set.
+        Deletes messages from an SQS queue in batches of up to 10 per request.
+
+        Args:
+            queue_name: The name of the SQS queue.
+            receipt_handles: The receipt handles of the messages to delete.
 
         Returns:
-            True if all required environment variables are set, False otherwise.
+            The receipt handles that could not be deleted.
         """
-        logger.info(
-            "Checking for AWS environment variables (AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, AWS_REGION)."
+        logger.opt(lazy=True).debug(
+            "Attempting to delete {} messages from queue: {}",
+            lambda: len(receipt_handles),
+            lambda: queue_name,
         )
-        if (
-            not os.getenv("AWS_ACCESS_KEY_ID")
-            or not os.getenv("AWS_SECRET_ACCESS_KEY")
-            or not os.getenv("AWS_REGION")
-        ):
-            logger.warning(
-                "AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, or AWS_REGION environment variables are not set."
-            )
-            return False
-        else:
-            logger.info("Environment variables configured correctly.")
-            return True
+        failed_handles = []
+        for start in range(0, len(receipt_handles), SQS_BATCH_SIZE):
+            chunk = receipt_handles[start : start + SQS_BATCH_SIZE]
+            entries = [
+                {"Id": str(index), "ReceiptHandle": receipt_handle}
+                for index, receipt_handle in enumerate(chunk)
+            ]
+            try:
+                response = self._call_with_queue_url(
+                    queue_name, "delete_message_batch", Entries=entries
+                )
+                if response is None:
+                    logger.warning(
+                        f"Could not get queue URL for {queue_name}. Cannot delete messages."
+                    )
+                    failed_handles.extend(chunk)
+                    continue
+
+                for failure in response.get("Failed", []):
+                    logger.error(
+                        f"Error deleting message from queue {queue_name}: "
+                        f"{failure.get('Code')} {failure.get('Message')}"
+                    )
+                    failed_handles.append(chunk[int(failure["Id"])])
+            except (BotoCoreError, ClientError) as e:
+                logger.error(f"Error deleting messages from queue {queue_name}: {e}")
+                failed_handles.extend(chunk)
+
+        logger.opt(lazy=True).debug(
+            "Deleted {} of {} messages from queue {}.",
+            lambda: len(receipt_handles) - len(failed_handles),
+            lambda: len(receipt_handles),
+            lambda: queue_name,
+        )
+        return failed_handles
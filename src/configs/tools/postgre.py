@@ -1,9 +1,66 @@
+import csv
+import io
 import os
+import threading
+from contextlib import contextmanager
 
 import psycopg2
 from loguru import logger
+from psycopg2 import pool, sql
+from psycopg2.extras import execute_values
 from sqlalchemy import create_engine
 
+_REQUIRED_ENV_VARS = ("DB_NAME", "DB_USER", "DB_PASSWORD", "DB_HOST")
+
+# Rows per COPY command when DataFrames are loaded with copy_insert.
+COPY_CHUNK_SIZE = 10000
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def _csv_buffer(rows):
+    """
+    Serializes rows to an in-memory CSV buffer for COPY ... FROM STDIN.
+
+    Strings are quoted so that empty strings and NULLs stay distinct: COPY
+    reads an unquoted empty field as NULL.
+    """
+    buffer = io.StringIO()
+    csv.writer(buffer, quoting=csv.QUOTE_STRINGS).writerows(rows)
+    buffer.seek(0)
+    return buffer
+
+
+def _copy_query(target, columns):
+    """
+    Builds the COPY ... FROM STDIN statement matching `_csv_buffer`.
+    """
+    return sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv)").format(
+        target, sql.SQL(", ").join(map(sql.Identifier, columns))
+    )
+
+
+def copy_insert(table, conn, keys, data_iter):
+    """
+    Insertion method for DataFrame.to_sql that loads rows with COPY.
+
+    Pass it as `method=copy_insert`; to_sql still creates the table when it
+    does not exist, but the rows are streamed through an in-memory CSV buffer
+    in one COPY ... FROM STDIN per chunk instead of parameterized INSERTs.
+
+    Args:
+        table (pandas.io.sql.SQLTable): The target table.
+        conn (sqlalchemy.engine.Connection): The connection used by to_sql.
+        keys (list): The column names.
+        data_iter (iterable): The rows to insert.
+    """
+    target = sql.Identifier(table.name)
+    if table.schema:
+        target = sql.SQL(".").join([sql.Identifier(table.schema), target])
+    with conn.connection.cursor() as cursor:
+        cursor.copy_expert(_copy_query(target, keys), _csv_buffer(data_iter))
+
 
 class RDSPostgreSQLManager:
     """
@@ -11,7 +68,9 @@ class RDSPostgreSQLManager:
 
     This class provides methods to connect to a PostgreSQL database,
     execute queries, and perform insertions. It can use credentials
-    passed during initialization or environment variables.
+    passed during initialization or environment variables. Queries and
+    insertions reuse connections from a thread-safe pool that is opened
+    on first use.
     """
 
     def __init__(
@@ -35,22 +94,24 @@ class RDSPostgreSQLManager:
             ValueError: If no database credentials are provided either directly
                         or via environment variables.
         """
-        env_vars_set = self.check_environment_variables()
-
         if (
             db_name is None
             and db_user is None
             and db_password is None
             and db_host is None
-            and not env_vars_set
+            and not DB_ENV_VARS_SET
         ):
             raise ValueError("Database credentials were not provided.")
 
-        self.db_name = db_name or os.getenv("DB_NAME")
-        self.db_user = db_user or os.getenv("DB_USER")
-        self.db_password = db_password or os.getenv("DB_PASSWORD")
-        self.db_host = db_host or os.getenv("DB_HOST")
+        self.db_name = db_name or DB_NAME
+        self.db_user = db_user or DB_USER
+        self.db_password = db_password or DB_PASSWORD
+        self.db_host = db_host or DB_HOST
         self.db_port = db_port
+        self.pool_size = DB_POOL_SIZE
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self.engine = None
 
     def connect(self):
         """
@@ -74,6 +135,63 @@ class RDSPostgreSQLManager:
             logger.error(f"Error connecting to the PostgreSQL database: {e}")
             return None
 
+    def get_pool(self):
+        """
+        Returns the connection pool, creating it on first use.
+
+        Returns:
+            psycopg2.pool.ThreadedConnectionPool: The connection pool.
+
+        Raises:
+            psycopg2.Error: If the first connection cannot be established.
+        """
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = pool.ThreadedConnectionPool(
+                        minconn=1,
+                        maxconn=self.pool_size,
+                        dbname=self.db_name,
+                        user=self.db_user,
+                        password=self.db_password,
+                        host=self.db_host,
+                        port=self.db_port,
+                    )
+                    logger.info(
+                        f"Created PostgreSQL connection pool with up to {self.pool_size} connections."
+                    )
+        return self._pool
+
+    @contextmanager
+    def pooled_connection(self):
+        """
+        Borrows a connection from the pool and returns it when done.
+
+        The transaction is rolled back if the block raises, so the connection
+        goes back to the pool in a clean state.
+
+        Yields:
+            psycopg2.extensions.connection: A pooled database connection.
+        """
+        connection_pool = self.get_pool()
+        connection = connection_pool.getconn()
+        try:
+            yield connection
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection_pool.putconn(connection)
+
+    def close_pool(self):
+        """
+        Closes every connection held by the pool.
+        """
+        if self._pool is not None:
+            self._pool.closeall()
+            self._pool = None
+            logger.info("PostgreSQL connection pool closed.")
+
     def execute_query(self, query):
         """
         Executes a SQL query on the database and returns the results.
@@ -85,26 +203,40 @@ class RDSPostgreSQLManager:
             list or None: A list of tuples containing the query results if successful,
                           None otherwise.
         """
-        connection = self.connect()
-        if connection:
-            try:
-                cursor = connection.cursor()
-                cursor.execute(query)
-                result = cursor.fetchall()
-                cursor.close()
+        try:
+            with self.pooled_connection() as connection:
+                with connection.cursor() as cursor:
+                    cursor.execute(query)
+                    result = cursor.fetchall()
                 connection.commit()
-                connection.close()
-                logger.info("SQL query executed successfully.")
-                return result
-            except psycopg2.Error as e:
-                logger.error(f"Error executing SQL query: {e}")
-                if connection:
-                    connection.close()
-                return None
-        else:
-            logger.warning("Could not establish database connection to execute query.")
+            logger.info("SQL query executed successfully.")
+            return result
+        except psycopg2.Error as e:
+            logger.error(f"Error executing SQL query: {e}")
             return None
 
+    def iter_query(self, query, itersize=10000):
+        """
+        Executes a SQL query and yields its rows one at a time.
+
+        Rows are read through a server-side cursor in batches of `itersize`,
+        so large result sets are never fully materialized in memory. The
+        connection returns to the pool once the iterator is exhausted or closed.
+
+        Args:
+            query (str): The SQL query string to execute.
+            itersize (int): The number of rows fetched from the server per batch.
+
+        Yields:
+            tuple: One result row.
+        """
+        with self.pooled_connection() as connection:
+            with connection.cursor(name="iter_query") as cursor:
+                cursor.itersize = itersize
+                cursor.execute(query)
+                yield from cursor
+            connection.commit()
+
     def execute_insert(self, query, values):
         """
         Executes a SQL insert statement on the database.
@@ -114,27 +246,65 @@ class RDSPostgreSQLManager:
             values (tuple or list): The values to be inserted, matching the placeholders
                                     in the query.
         """
-        connection = self.connect()
-        if connection:
-            try:
-                cursor = connection.cursor()
-                cursor.execute(query, values)
+        try:
+            with self.pooled_connection() as connection:
+                with connection.cursor() as cursor:
+                    cursor.execute(query, values)
                 connection.commit()  # Commit the transaction
-                cursor.close()
-                connection.close()
-                logger.info("Insertion successful.")
-            except psycopg2.Error as e:
-                logger.error(f"Error executing SQL insert: {e}")
-                if connection:
-                    connection.close()
-            except Exception as e:
-                logger.error(
-                    f"An unexpected error occurred during insert execution: {e}"
-                )
-                if connection:
-                    connection.close()
-        else:
-            logger.warning("Could not establish database connection to execute insert.")
+            logger.info("Insertion successful.")
+        except psycopg2.Error as e:
+            logger.error(f"Error executing SQL insert: {e}")
+        except Exception as e:
+            logger.error(f"An unexpected error occurred during insert execution: {e}")
+
+    def execute_insert_many(self, table, columns, rows, page_size=1000):
+        """
+        Inserts many rows with multi-row INSERT statements.
+
+        Args:
+            table (str): The name of the target table.
+            columns (list): The column names, in the same order as each row.
+            rows (list): The rows to insert, as tuples or lists.
+            page_size (int): The number of rows sent per INSERT statement.
+        """
+        query = sql.SQL("INSERT INTO {} ({}) VALUES %s").format(
+            sql.Identifier(table), sql.SQL(", ").join(map(sql.Identifier, columns))
+        )
+        try:
+            with self.pooled_connection() as connection:
+                with connection.cursor() as cursor:
+                    execute_values(cursor, query, rows, page_size=page_size)
+                connection.commit()
+            logger.info(f"Inserted {len(rows)} rows into {table}.")
+        except psycopg2.Error as e:
+            logger.error(f"Error executing bulk insert into {table}: {e}")
+        except Exception as e:
+            logger.error(f"An unexpected error occurred during bulk insert: {e}")
+
+    def copy_rows(self, table, columns, rows):
+        """
+        Loads many rows with COPY ... FROM STDIN, for very large loads.
+
+        The rows are serialized to an in-memory CSV buffer, the same way as by
+        `copy_insert`, and streamed to PostgreSQL in a single COPY command.
+
+        Args:
+            table (str): The name of the target table.
+            columns (list): The column names, in the same order as each row.
+            rows (iterable): The rows to load, as tuples or lists.
+        """
+        buffer = _csv_buffer(rows)
+        query = _copy_query(sql.Identifier(table), columns)
+        try:
+            with self.pooled_connection() as connection:
+                with connection.cursor() as cursor:
+                    cursor.copy_expert(query, buffer)
+                connection.commit()
+            logger.info(f"Copied rows into {table}.")
+        except psycopg2.Error as e:
+            logger.error(f"Error copying rows into {table}: {e}")
+        except Exception as e:
+            logger.error(f"An unexpected error occurred during COPY: {e}")
 
     @staticmethod
     def check_environment_variables():
@@ -144,8 +314,7 @@ class RDSPostgreSQLManager:
         Returns:
             bool: True if all required environment variables are set, False otherwise.
         """
-        required_vars = ["DB_NAME", "DB_USER", "DB_PASSWORD", "DB_HOST"]
-        missing_vars = [var for var in required_vars if not os.getenv(var)]
+        missing_vars = [var for var in _REQUIRED_ENV_VARS if not os.environ.get(var)]
 
         if missing_vars:
             logger.warning(
@@ -158,14 +327,71 @@ class RDSPostgreSQLManager:
 
     def alchemy(self):
         """
-        Creates and returns a SQLAlchemy engine for the database.
+        Returns a SQLAlchemy engine for the database, creating it on first use.
+
+        The engine and its connection pool are reused by later calls. Pooled
+        connections are checked before use and recycled every 30 minutes.
 
         Returns:
             sqlalchemy.engine.base.Engine: The SQLAlchemy engine object.
         """
-        db_url = f"postgresql://{self.db_user}:{self.db_password}@{self.db_host}:{self.db_port}/{self.db_name}"
-        logger.info(
-            f"Creating SQLAlchemy engine for database: {self.db_name} on host: {self.db_host}"
-        )
-        self.engine = create_engine(db_url)
+        if self.engine is None:
+            db_url = f"postgresql+psycopg2://{self.db_user}:{self.db_password}@{self.db_host}:{self.db_port}/{self.db_name}"
+            logger.info(
+                f"Creating SQLAlchemy engine for database: {self.db_name} on host: {self.db_host}"
+            )
+            self.engine = create_engine(
+                db_url,
+                pool_size=10,
+                max_overflow=20,
+                pool_pre_ping=True,
+                pool_recycle=1800,
+            )
         return self.engine
+
+
+def get_engine():
+    """
+    Returns the SQLAlchemy engine shared by the whole process.
+
+    The engine is built from the environment credentials on first use and
+    its connection pool is reused by every later caller, so loading many
+    PDFs does not pay a new connection handshake per file.
+
+    Returns:
+        sqlalchemy.engine.base.Engine: The shared SQLAlchemy engine.
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = RDSPostgreSQLManager().alchemy()
+    return _engine
+
+
+def reload_env():
+    """
+    Reads the database settings from the environment into module-level constants.
+
+    Settings are read once at import so that creating a manager does not probe
+    the environment again. Call this after changing os.environ (e.g. in tests)
+    so that managers created afterwards see the new values. The shared engine
+    is discarded and rebuilt on the next get_engine call.
+    """
+    global DB_ENV_VARS_SET, DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_POOL_SIZE
+    global _engine
+
+    with _engine_lock:
+        if _engine is not None:
+            _engine.dispose()
+            _engine = None
+
+    DB_ENV_VARS_SET = RDSPostgreSQLManager.check_environment_variables()
+    DB_NAME = os.environ.get("DB_NAME")
+    DB_USER = os.environ.get("DB_USER")
+    DB_PASSWORD = os.environ.get("DB_PASSWORD")
+    DB_HOST = os.environ.get("DB_HOST")
+    DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE") or 10)
+
+
+reload_env()
@@ -1,15 +1,134 @@
-import json
 import os
 import re
+import threading
+import time
 import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from queue import Empty, Queue
 
+import orjson
 from loguru import logger
 
 from configs.rules.notas import rules_dict
+from configs.tools.aws import session
 from configs.tools.aws.sqs import AWSSQSManager
 from extractor_text_pdf import PDFTextExtractor
 from table_pdf_extractor import PDFTableExtractor
 
+MAX_RECEIVE_COUNT = 5
+SQS_WORKERS = int(os.getenv("SQS_WORKERS") or 10)
+# Pause after an empty receive that returned before the long poll could
+# elapse, which means the receive failed, so errors do not spin the loop.
+RECEIVE_ERROR_BACKOFF_SECONDS = 1
+# Messages are received with a 30 second visibility timeout; while one is
+# being processed, its timeout is pushed out every VISIBILITY_HEARTBEAT_SECONDS.
+VISIBILITY_HEARTBEAT_SECONDS = 20
+VISIBILITY_EXTENSION_SECONDS = 60
+
+_PLUS_BEFORE_PAREN = re.compile(r"\+(?=\()")
+
+
+def get_object_key(body: str) -> str:
+    """
+    Parses the S3 object key from the body of an S3 event notification.
+
+    Args:
+        body: The raw JSON body of the SQS message, as str or bytes.
+
+    Returns:
+        The unquoted and cleaned S3 object key.
+    """
+    json_body = orjson.loads(body)
+    object_key = json_body["Records"][0]["s3"]["object"]["key"]
+    object_key_unquote = urllib.parse.unquote(object_key)
+    if "+(" not in object_key_unquote:
+        return object_key_unquote
+    return _PLUS_BEFORE_PAREN.sub(" ", object_key_unquote)
+
+
+def process_file(object_key: str) -> bool:
+    """
+    Runs the text and table extractors for a PDF file in S3.
+
+    The two extractors are independent, so the text extraction runs on a
+    helper thread while the table extraction runs on the calling thread.
+    If either raises, the exception propagates once both have finished.
+
+    Args:
+        object_key: The S3 object key of the PDF file.
+
+    Returns:
+        True if both extractors succeeded, False otherwise.
+    """
+    logger.info("Processing file: {}", object_key)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        text_future = executor.submit(lambda: PDFTextExtractor(object_key).start())
+        resultImg = PDFTableExtractor(object_key, configs=rules_dict["jornada"]).start()
+        resultTxt = text_future.result()
+    if resultTxt and resultImg:
+        logger.info("Task processed successfully")
+        return True
+    logger.warning("Task processed with failure or partial success")
+    return False
+
+
+def process_body(body: str, message_id: str | None) -> bool:
+    """
+    Runs the extractors for the PDF named in an S3 event notification.
+
+    Only a raise is worth a redelivery. Each extractor commits its own rows,
+    so an extraction that reports failure may already have written some of
+    them, and processing the message again would insert those rows twice.
+
+    Args:
+        body: The raw JSON body of the SQS message.
+        message_id: The SQS message ID, for logging.
+
+    Returns:
+        True if the message is done and can be deleted, False if processing
+        raised and the message should be redelivered.
+    """
+    try:
+        process_file(get_object_key(body))
+    except Exception:
+        logger.exception("Failed to process message from queue: {}", message_id)
+        return False
+    return True
+
+
+def process_message(message: dict) -> str | None:
+    """
+    Processes a single SQS message. Deleting it from the queue is left
+    to the caller.
+
+    Messages already received more than MAX_RECEIVE_COUNT times are
+    treated as poison messages and skipped without being processed.
+
+    1. Parses the S3 object key from the message body.
+    2. Processes the object key (unquoting and cleaning).
+    3. Calls PDFTextExtractor and PDFTableExtractor to process the PDF.
+    4. Logs success or failure based on the results from the extractors.
+
+    Args:
+        message: The SQS message as returned by ReceiveMessage.
+
+    Returns:
+        The receipt handle of the message if it should be deleted, or None
+        if processing raised and the message should be redelivered.
+    """
+    receipt_handle = message["ReceiptHandle"]
+    receive_count = int(message.get("Attributes", {}).get("ApproximateReceiveCount", 1))
+    if receive_count > MAX_RECEIVE_COUNT:
+        logger.warning(
+            f"Dropping message received {receive_count} times: {message.get('MessageId')}"
+        )
+        return receipt_handle
+
+    if not process_body(message["Body"], message.get("MessageId")):
+        return None
+    return receipt_handle
+
 
 class HTMLSQSListener:
     """
@@ -23,49 +142,188 @@ class HTMLSQSListener:
 
     def __init__(self):
         """
-        Initializes the HTMLSQSListener by getting the queue name from
-        environment variables and setting up the SQS manager.
+        Initializes the HTMLSQSListener by getting the queue name and the
+        number of workers (SQS_WORKERS, default 10) from environment
+        variables, and setting up the SQS manager and the worker pool.
         """
-        self.queue = os.getenv("QUEUE_NAME")
+        self.queue = session.QUEUE_NAME
         self.sqs = AWSSQSManager()
+        self.workers = SQS_WORKERS
+        self.pool = ThreadPoolExecutor(max_workers=self.workers)
 
     def check_messages(self):
         """
-        Checks the SQS queue for messages. If messages are found, it processes
-        each message sequentially.
+        Long-polls the SQS queue once with several concurrent receive calls.
+        If messages are received, they are processed concurrently on the
+        worker pool with `process_message`, then all handled messages are
+        deleted with batch requests.
+        At most one message per worker is received, so every message starts
+        processing, and its visibility heartbeat, right after the receive.
+        Messages whose processing raised are left in the queue to be
+        redelivered.
+        """
+        messages = self.sqs.receive_messages_parallel(
+            self.queue, max_messages=self.workers
+        )
+        if not messages:
+            logger.debug("No messages received from queue: {}", self.queue)
+            return
+
+        futures = [self.pool.submit(self._process, message) for message in messages]
+        receipt_handles = []
+        for future in as_completed(futures):
+            receipt_handle = future.result()
+            if receipt_handle is not None:
+                receipt_handles.append(receipt_handle)
+        self.sqs.delete_messages_from_queue(self.queue, receipt_handles)
+
+    def listen(self):
+        """
+        Continuously long-polls the SQS queue and processes messages in a
+        producer/consumer pipeline.
+
+        A producer thread keeps receiving messages into a local queue while
+        one consumer per worker thread processes them, so the next receive
+        overlaps with PDF processing. Each receive asks for at most as many
+        messages as there are idle workers, and every message's visibility
+        heartbeat starts as soon as it is received, so no message can become
+        visible again while it waits for a worker.
+        """
+        pending = Queue()
+        stop = threading.Event()
+        free_workers = threading.Semaphore(self.workers)
+
+        producer = threading.Thread(
+            target=self._produce, args=(pending, stop, free_workers), daemon=True
+        )
+        producer.start()
+        logger.info(f"Listening to queue {self.queue} with {self.workers} workers.")
+
+        for _ in range(self.workers):
+            self.pool.submit(self._consume, pending, stop, free_workers)
+        try:
+            stop.wait()
+        except (KeyboardInterrupt, SystemExit):
+            logger.info("Stopping queue listener.")
+            stop.set()
+        finally:
+            self.pool.shutdown(wait=True)
+            producer.join()
+            # Let messages nobody picked up become visible again.
+            while not pending.empty():
+                _, stop_heartbeat = pending.get_nowait()
+                stop_heartbeat()
+
+    def start_heartbeat(self, receipt_handle: str):
+        """
+        Starts keeping a message invisible to other consumers.
+
+        A background thread extends the message's visibility timeout every
+        VISIBILITY_HEARTBEAT_SECONDS, so slow PDFs are not redelivered and
+        processed twice.
+
+        Args:
+            receipt_handle: The receipt handle of the received message.
+
+        Returns:
+            A function that stops the heartbeat and waits for its thread.
+        """
+        done = threading.Event()
+
+        def heartbeat():
+            while not done.wait(VISIBILITY_HEARTBEAT_SECONDS):
+                self.sqs.extend_visibility(
+                    self.queue, receipt_handle, VISIBILITY_EXTENSION_SECONDS
+                )
 
-        For each message:
-        1. Parses the S3 object key from the message body.
-        2. Processes the object key (unquoting and cleaning).
-        3. Calls PDFTextExtractor and PDFTableExtractor to process the PDF.
-        4. Logs success or failure based on the results from the extractors.
-        5. Deletes the message from the queue upon completion of processing
-           (either success or failure caught by the inner try/except, but before re-raising).
-        If extraction fails due to an exception, the message is deleted before
-        re-raising the exception.
+        thread = threading.Thread(target=heartbeat, daemon=True)
+        thread.start()
+
+        def stop():
+            done.set()
+            thread.join()
+
+        return stop
+
+    @contextmanager
+    def visibility_heartbeat(self, receipt_handle: str):
+        """
+        Keeps a message invisible to other consumers while the block runs.
+
+        Args:
+            receipt_handle: The receipt handle of the message being processed.
+        """
+        stop_heartbeat = self.start_heartbeat(receipt_handle)
+        try:
+            yield
+        finally:
+            stop_heartbeat()
+
+    def _process(self, message: dict) -> str | None:
+        """
+        Runs `process_message` under a visibility heartbeat.
         """
-        has_message = self.sqs.check_message_in_queue(self.queue)
-        if has_message:
-            messages = self.sqs.receive_messages_from_queue(self.queue)
+        with self.visibility_heartbeat(message["ReceiptHandle"]):
+            return process_message(message)
 
+    def _produce(
+        self, pending: Queue, stop: threading.Event, free_workers: threading.Semaphore
+    ):
+        """
+        Long-polls the SQS queue and feeds received messages to `pending`.
+
+        Each received message takes one of `free_workers` until a consumer has
+        handled it, and its visibility heartbeat starts right away. A receive
+        that raises is logged and retried after a pause, so the producer
+        never dies while the consumers wait on it.
+        """
+        while not stop.is_set():
+            if not free_workers.acquire(timeout=1):
+                continue
+            capacity = 1
+            while capacity < self.workers and free_workers.acquire(blocking=False):
+                capacity += 1
+
+            started = time.monotonic()
+            try:
+                messages = self.sqs.receive_messages_parallel(
+                    self.queue, max_messages=capacity
+                )
+            except Exception:
+                logger.exception(
+                    "Failed to receive messages from queue: {}", self.queue
+                )
+                messages = []
             for message in messages:
-                receipt_handle = message["ReceiptHandle"]
-                json_body = json.loads(message["Body"])
-                object_key = json_body["Records"][0]["s3"]["object"]["key"]
-                object_key_unquote = urllib.parse.unquote(object_key)
-                object_key_final = re.sub(r"\+(?=\()", " ", object_key_unquote)
+                stop_heartbeat = self.start_heartbeat(message["ReceiptHandle"])
+                pending.put((message, stop_heartbeat))
+            for _ in range(capacity - len(messages)):
+                free_workers.release()
 
+            if (
+                not messages
+                and time.monotonic() - started < RECEIVE_ERROR_BACKOFF_SECONDS
+            ):
+                stop.wait(RECEIVE_ERROR_BACKOFF_SECONDS)
+
+    def _consume(
+        self, pending: Queue, stop: threading.Event, free_workers: threading.Semaphore
+    ):
+        """
+        Takes messages from `pending` and processes them until stopped.
+        """
+        while not stop.is_set():
+            try:
+                message, stop_heartbeat = pending.get(timeout=1)
+            except Empty:
+                continue
+            try:
                 try:
-                    logger.info(f"Processing file: {object_key_final}")
-                    resultTxt = PDFTextExtractor(object_key_final).start()
-                    resultImg = PDFTableExtractor(
-                        object_key_final, configs=rules_dict["jornada"]
-                    ).start()
-                except Exception as e:
+                    receipt_handle = process_message(message)
+                finally:
+                    stop_heartbeat()
+                if receipt_handle is not None:
                     self.sqs.delete_message_from_queue(self.queue, receipt_handle)
-                    raise (e)
-                if resultTxt and resultImg:
-                    logger.info("Task processed successfully")
-                else:
-                    logger.warning("Task processed with failure or partial success")
-                self.sqs.delete_message_from_queue(self.queue, receipt_handle)
+            finally:
+                pending.task_done()
+                free_workers.release()
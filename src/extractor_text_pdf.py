@@ -1,24 +1,113 @@
+import csv
+import io
+import multiprocessing
 import os
-import re
-import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
 import pandas as pd
-import PyPDF2
+import pypdfium2 as pdfium
 from loguru import logger
 
-from configs.tools.aws.s3 import AWSS3
-from configs.tools.postgre import RDSPostgreSQLManager
-
-logger.add(sys.stderr, format="{time} {level} {message}", level="INFO")
+from configs.tools.aws import session
+from configs.tools.aws.s3 import get_s3
+from configs.tools.postgre import COPY_CHUNK_SIZE, copy_insert, get_engine
+
+# The operations section runs from the first "C/V" header up to the line
+# starting with "Posição Ajuste". Both markers are literals, so the section is
+# located with two linear str.find scans instead of a lazy `.*?` regex.
+_OPERATIONS_START = "C/V"
+_OPERATIONS_END = "\nPosição Ajuste"
+# Characters kept from the previous page so a marker split across pages is found.
+_MARKER_OVERLAP = max(len(_OPERATIONS_START), len(_OPERATIONS_END)) - 1
+
+
+def _find_operations(text):
+    """
+    Returns the (start, end) offsets of the operations section in `text`,
+    with end set to -1 when the section is not complete.
+    """
+    start = text.find(_OPERATIONS_START)
+    end = -1
+    if start != -1:
+        end = text.find(_OPERATIONS_END, start + len(_OPERATIONS_START))
+    return start, end
+
+
+# PDFium is not thread-safe, even across documents, and the queue listener
+# runs several extractors on worker threads, so in-process calls are serialized.
+_PDFIUM_LOCK = threading.Lock()
+
+# On multi-core hosts, PDFs with at least this many pages have their text
+# extracted by a process pool, one contiguous range of pages per worker.
+PARALLEL_PAGE_THRESHOLD = 16
+PAGE_WORKERS = min(4, os.cpu_count() or 1)
+
+_page_pool = None
+_page_pool_lock = threading.Lock()
+
+
+def _get_page_pool():
+    """
+    Returns the process pool used for parallel page extraction, creating it
+    on first use. Workers are spawned rather than forked because the parent
+    process runs threads.
+    """
+    global _page_pool
+    if _page_pool is None:
+        with _page_pool_lock:
+            if _page_pool is None:
+                _page_pool = ProcessPoolExecutor(
+                    max_workers=PAGE_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _page_pool
+
+
+def _discard_page_pool():
+    """
+    Drops the page extraction pool, e.g. after it broke, so the next
+    parallel extraction starts a new one.
+    """
+    global _page_pool
+    with _page_pool_lock:
+        pool, _page_pool = _page_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _extract_pages_text(pdf_bytes, start, stop):
+    """
+    Opens a PDF from bytes and returns the text of pages [start, stop).
+    """
+    pdf = pdfium.PdfDocument(pdf_bytes)
+    try:
+        return "".join(
+            pdf[index].get_textpage().get_text_range() for index in range(start, stop)
+        )
+    finally:
+        pdf.close()
 
 
 class PDFTextExtractor:
-    def __init__(self, pdf_file_path):
+    def __init__(self, pdf_file_path, pdf_stream=None):
         self.pdf_file_path = pdf_file_path
+        self.pdf_stream = pdf_stream
         self.extracted_text = ""
-        self.aws = AWSS3()
+        self._extracted_text_list = None
+        self._aws = None
         logger.info(f"PDFTextExtractor initialized for file: {pdf_file_path}")
 
+    @property
+    def aws(self):
+        """
+        The S3 manager, shared by all extractors and created on first use.
+        """
+        if self._aws is None:
+            self._aws = get_s3()
+        return self._aws
+
     def start(self):
         """
         Starts the PDF text extraction, transformation, and database loading process.
@@ -36,30 +125,126 @@ class PDFTextExtractor:
 
     def extract_text(self):
         """
-        Downloads the PDF file and extracts text content page by page.
+        Reads the PDF from memory and extracts text content page by page.
         Then extracts relevant operations text and splits it by newline.
+
+        The PDF is downloaded from S3 into memory unless a binary stream was
+        given to the constructor. The result is cached, so later calls (e.g.
+        from get_text and get_df) neither download nor parse the PDF again.
         """
-        self.download_file()
-        pdf_local_path = f"download/{self.pdf_file_path}"
-        logger.info(f"Opening PDF file: {pdf_local_path}")
-        with open(pdf_local_path, "rb") as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            logger.info(
-                f"Successfully opened PDF. Number of pages: {len(pdf_reader.pages)}"
+        if self._extracted_text_list is not None:
+            return self._extracted_text_list
+
+        pdf_stream = self.pdf_stream or self.download_file()
+        if pdf_stream is None:
+            raise FileNotFoundError(
+                f"PDF file could not be downloaded: {self.pdf_file_path}"
             )
 
-            extracted_text = ""
-            for page_num in range(len(pdf_reader.pages)):
-                page = pdf_reader.pages[page_num]
-                extracted_text += page.extract_text()
-                logger.debug(f"Extracted text from page {page_num + 1}")
+        pdf_stream.seek(0)
+        pdf_bytes = pdf_stream.read()
+
+        logger.info(f"Opening PDF file: {self.pdf_file_path}")
+        page_texts = None
+        with _PDFIUM_LOCK:
+            pdf = pdfium.PdfDocument(pdf_bytes)
+            try:
+                page_count = len(pdf)
+                logger.info(f"Successfully opened PDF. Number of pages: {page_count}")
+                if PAGE_WORKERS <= 1 or page_count < PARALLEL_PAGE_THRESHOLD:
+                    page_texts = self.extract_pages(pdf, page_count)
+            finally:
+                pdf.close()
+
+        if page_texts is None:
+            page_texts = self.extract_pages_in_parallel(pdf_bytes, page_count)
+        if page_texts is None:
+            with _PDFIUM_LOCK:
+                pdf = pdfium.PdfDocument(pdf_bytes)
+                try:
+                    page_texts = self.extract_pages(pdf, page_count)
+                finally:
+                    pdf.close()
+
+        # PDFium ends lines with CRLF; normalize them so the operations
+        # pattern and the line split see the same text as before.
+        extracted_text = "".join(page_texts).replace("\r\n", "\n")
 
         extracted_operations_text = self.extract_operations(extracted_text)
         text_lines = self.split_text_by_newline(extracted_operations_text)
 
         logger.info("Text extraction and initial processing complete.")
+        self._extracted_text_list = text_lines
         return text_lines
 
+    def extract_pages(self, pdf, page_count):
+        """
+        Extracts page text from an open PDF in this process, in page order.
+        Must be called while holding _PDFIUM_LOCK.
+        """
+        page_texts = []
+        # Only the operations section is used, so stop as soon as it is
+        # complete instead of parsing every page. Each page is scanned once,
+        # together with a short tail of the previous text so that markers
+        # split across pages are still found; offsets are absolute.
+        tail = ""
+        text_length = 0
+        section_start = -1
+        for page_num, page in enumerate(pdf, start=1):
+            text = page.get_textpage().get_text_range()
+            page_texts.append(text)
+            logger.debug("Extracted text from page {}", page_num)
+
+            window = tail + text
+            window_offset = text_length - len(tail)
+            if section_start == -1:
+                index = window.find(_OPERATIONS_START)
+                if index != -1:
+                    section_start = window_offset + index
+            if section_start != -1:
+                end_from = section_start + len(_OPERATIONS_START) - window_offset
+                if window.find(_OPERATIONS_END, max(end_from, 0)) != -1:
+                    logger.debug(
+                        "Operations section complete on page {} of {}.",
+                        page_num,
+                        page_count,
+                    )
+                    break
+
+            text_length += len(text)
+            tail = window[-_MARKER_OVERLAP:]
+        return page_texts
+
+    def extract_pages_in_parallel(self, pdf_bytes, page_count):
+        """
+        Extracts page text on the process pool, splitting the pages into one
+        contiguous range per worker. Returns the texts in page order.
+
+        Returns None if the pool cannot be used, e.g. on AWS Lambda, which
+        has no /dev/shm for the semaphores multiprocessing needs; the caller
+        then extracts the pages in process.
+        """
+        step = -(-page_count // PAGE_WORKERS)
+        starts = range(0, page_count, step)
+        logger.info(
+            f"Extracting {page_count} pages in parallel on {len(starts)} processes."
+        )
+        try:
+            return list(
+                _get_page_pool().map(
+                    _extract_pages_text,
+                    [pdf_bytes] * len(starts),
+                    starts,
+                    [min(start + step, page_count) for start in starts],
+                )
+            )
+        except (OSError, NotImplementedError, BrokenProcessPool) as e:
+            logger.warning(
+                f"Parallel page extraction failed ({e}). Extracting pages sequentially."
+            )
+            _discard_page_pool()
+            return None
+
     def split_text_by_newline(self, text):
         """
         Splits the text by newline characters and returns as a list of strings.
@@ -74,16 +259,19 @@ class PDFTextExtractor:
 
     def extract_operations(self, text):
         """
-        Extracts the section of text containing operations using a regex pattern.
+        Extracts the section of text containing operations, from the "C/V"
+        header up to (not including) the "Posição Ajuste" line.
         """
-        pattern = r"(C/V.*?)(?=\nPosição Ajuste)"
-        logger.debug(f"Attempting to extract operations using pattern: {pattern}")
-
-        result = re.search(pattern, text, re.DOTALL)
+        logger.debug(
+            "Attempting to extract operations between {!r} and {!r}",
+            _OPERATIONS_START,
+            _OPERATIONS_END,
+        )
 
-        if result:
+        start, end = _find_operations(text)
+        if end != -1:
             logger.info("Operations text pattern found.")
-            return result.group(1)
+            return text[start:end]
         else:
             logger.warning("Operations text pattern not found.")
             return "Pattern not found."
@@ -92,18 +280,26 @@ class PDFTextExtractor:
         """
         Converts the list of operation text lines into a pandas DataFrame.
         Assumes the first line is the header.
+
+        Lines are tokenized on whitespace by pandas' C parser. Every value is
+        kept as a string, and missing trailing fields become NaN.
         """
         if not operations_text_list:
             logger.warning("No operations text provided to convert to DataFrame.")
             return pd.DataFrame()
 
-        header = operations_text_list[0].split()
-        data = [line.split() for line in operations_text_list[1:] if line]
-
+        dataframe = pd.read_csv(
+            io.StringIO("\n".join(operations_text_list)),
+            sep=r"\s+",
+            quoting=csv.QUOTE_NONE,
+            dtype=str,
+            index_col=False,
+            keep_default_na=False,
+            na_values=[""],
+        )
         logger.info(
-            f"Creating DataFrame with header: {header} and {len(data)} data rows."
+            f"Created DataFrame with header: {list(dataframe.columns)} and {len(dataframe)} data rows."
         )
-        dataframe = pd.DataFrame(data, columns=header)
 
         logger.debug("DataFrame created successfully.")
         return dataframe
@@ -126,58 +322,43 @@ class PDFTextExtractor:
 
     def download_file(self):
         """
-        Downloads the PDF file from the configured AWS S3 bucket.
-        Creates a local 'download' directory if it doesn't exist.
+        Downloads the PDF file from the configured AWS S3 bucket into memory.
         Logs the download process steps.
 
         Returns:
-            The result of the self.aws.download_file_from_s3 call.
-            (Assumed to be boolean True/False based on previous context, but could be anything).
+            A BytesIO with the PDF content, or None if the download failed.
         """
         logger.info(f"Starting download process for file: {self.pdf_file_path}")
 
-        bucket = os.getenv("AWS_BUCKET")
+        bucket = session.AWS_BUCKET
         if not bucket:
             logger.error("AWS_BUCKET environment variable not set. Download skipped.")
-            return False
-
-        local_dir = "download"
-        local_file_path = os.path.join(local_dir, self.pdf_file_path)
-
-        if not os.path.exists(local_dir):
-            logger.info(f"Creating local download directory: {local_dir}")
-            try:
-                os.makedirs(local_dir, exist_ok=True)
-            except Exception as e:
-                logger.error(f"Failed to create local directory {local_dir}: {e}")
-                return False
+            return None
 
         logger.info(
             f"Calling S3 download method for '{self.pdf_file_path}' from bucket '{bucket}'"
         )
         try:
-            result = self.aws.download_file_from_s3(
-                bucket, self.pdf_file_path, local_file_path
-            )
+            pdf_stream = self.aws.download_file_to_bytes(bucket, self.pdf_file_path)
 
-            if result:
+            if pdf_stream is not None:
                 logger.info(
                     f"S3 download call completed successfully for '{self.pdf_file_path}'."
                 )
             else:
                 logger.error(f"S3 download call failed for '{self.pdf_file_path}'.")
 
-            return result
+            return pdf_stream
 
         except Exception as e:
             logger.exception(
                 f"An unexpected error occurred during S3 download call for '{self.pdf_file_path}'"
             )
-            return False
+            return None
 
     def send_to_db(self, dataframe, table_name):
         """
-        Saves the DataFrame to the specified PostgreSQL table and removes the local PDF file.
+        Saves the DataFrame to the specified PostgreSQL table.
         """
         if dataframe.empty:
             logger.warning(
@@ -186,23 +367,16 @@ class PDFTextExtractor:
             return
 
         logger.info(f"Attempting to save data to database table: {table_name}")
-        connection = None
         try:
-            db_manager = RDSPostgreSQLManager()
-            connection = db_manager.alchemy()
-            dataframe.to_sql(table_name, connection, if_exists="append", index=False)
+            dataframe.to_sql(
+                table_name,
+                get_engine(),
+                if_exists="append",
+                index=False,
+                method=copy_insert,
+                chunksize=COPY_CHUNK_SIZE,
+            )
             logger.success(f"Successfully saved data to database table: {table_name}")
 
-            pdf_local_path = f"download/{self.pdf_file_path}"
-            if os.path.exists(pdf_local_path):
-                os.remove(pdf_local_path)
-                logger.info(f"Removed local PDF file: {pdf_local_path}")
-            else:
-                logger.warning(f"Local PDF file not found to remove: {pdf_local_path}")
-
         except Exception as e:
             logger.exception(f"Error saving data to database table {table_name}: {e}")
-        finally:
-            if connection:
-                connection.dispose()
-                logger.debug("Database connection closed.")
@@ -0,0 +1,32 @@
+from configs.logger import setup_logger
+from configs.tools.queue import process_body
+
+# Lambda freezes the process between invocations, so records are written
+# synchronously instead of through a background queue.
+setup_logger(enqueue=False)
+
+
+def handler(event, context):
+    """
+    AWS Lambda entrypoint for an SQS event source mapping.
+
+    SQS invokes the function with batches of up to 10 messages, so no
+    scheduler or polling loop is needed. Records are handled by
+    `process_body`, with the same retry policy as the queue listener:
+    messages whose processing raised are reported back as batch item
+    failures. SQS redelivers them and, once the queue's redrive policy is
+    exhausted, moves them to the dead-letter queue. Requires
+    `ReportBatchItemFailures` on the event source mapping.
+
+    Args:
+        event: The SQS event with the batch of records.
+        context: The Lambda context object (unused).
+
+    Returns:
+        The batch response listing the message IDs that failed.
+    """
+    batch_item_failures = []
+    for record in event["Records"]:
+        if not process_body(record["body"], record["messageId"]):
+            batch_item_failures.append({"itemIdentifier": record["messageId"]})
+    return {"batchItemFailures": batch_item_failures}
@@ -0,0 +1,37 @@
+import sys
+
+from loguru import logger
+
+from configs.logger import setup_logger
+from configs.rules.notas import rules_dict
+from extractor_text_pdf import PDFTextExtractor
+from table_pdf_extractor import PDFTableExtractor
+
+
+def run_once(file_name: str, rule: str = "jornada") -> bool:
+    """
+    Runs the text and table extractors once for a single PDF in S3,
+    without going through the SQS queue.
+
+    Args:
+        file_name: The S3 key of the PDF file.
+        rule: The key of the extraction rules in `rules_dict`.
+
+    Returns:
+        True if both extractors succeeded, False otherwise.
+    """
+    result_txt = PDFTextExtractor(file_name).start()
+    result_img = PDFTableExtractor(file_name, configs=rules_dict[rule]).start()
+    return result_txt and result_img
+
+
+if __name__ == "__main__":
+    setup_logger()
+    file_name = (
+        sys.argv[1] if len(sys.argv) > 1 else "corretora_jornada_de_dados (1).pdf"
+    )
+    rule = sys.argv[2] if len(sys.argv) > 2 else "jornada"
+    if run_once(file_name, rule):
+        logger.info(f"File processed successfully: {file_name}")
+    else:
+        logger.warning(f"File processed with failure or partial success: {file_name}")
@@ -1,15 +1,33 @@
+import multiprocessing
 import os
+import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 
 import camelot
 import pandas as pd
+from camelot.utils import bbox_from_str
 from loguru import logger
 from unidecode import unidecode
 
+from configs.logger import setup_logger
 from configs.rules.notas import rules_dict
-from configs.tools.aws.s3 import AWSS3
-from configs.tools.postgre import RDSPostgreSQLManager
+from configs.tools.aws import session
+from configs.tools.aws.s3 import get_s3
+from configs.tools.postgre import COPY_CHUNK_SIZE, copy_insert, get_engine
 
-DOWNLOAD_DIR = "download"
+# Camelot only reads from a file path, so PDFs are downloaded to a temporary
+# file on tmpfs when it is available instead of a directory on disk.
+TEMP_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+_NON_WORD_CHARS = re.compile(r"[^\w]+")
+
+
+def _process_one(file_name: str, configs: dict) -> bool:
+    """
+    Runs the table extraction pipeline for one file inside a batch worker.
+    """
+    return PDFTableExtractor(file_name, configs=configs).start()
 
 
 class PDFTableExtractor:
@@ -32,8 +50,17 @@ class PDFTableExtractor:
         """
         self.file_name = file_name
         self.configs = configs
-        self.aws = AWSS3()
-        self.download_path = os.path.join(DOWNLOAD_DIR, self.file_name)
+        self._aws = None
+        self.download_path = None
+
+    @property
+    def aws(self):
+        """
+        The S3 manager, shared by all extractors and created on first use.
+        """
+        if self._aws is None:
+            self._aws = get_s3()
+        return self._aws
 
     def start(self) -> bool:
         """
@@ -47,46 +74,50 @@ class PDFTableExtractor:
             True if the process completes successfully, False otherwise.
         """
         logger.info(f"Starting process for file: {self.file_name}")
-        file_downloaded = False
 
         try:
             self.download_file()
-            file_downloaded = True
             logger.info(f"File downloaded successfully: {self.download_path}")
 
             logger.info("Extracting tables from PDF...")
-            header_df = self.get_table_data(
-                self.configs.get("header_table_areas"),
-                self.configs.get("header_columns"),
-                self.configs.get("header_fix", True),
-                flavor=self.configs.get("header_flavor", self.configs["flavor"]),
-                pages=self.configs.get("header_pages", self.configs["pages"]),
-            )
-
-            main_df = self.get_table_data(
-                self.configs.get("table_areas"),
-                self.configs.get("columns"),
-                self.configs.get("fix", True),
-                flavor=self.configs.get("main_flavor", self.configs["flavor"]),
-                pages=self.configs.get("main_pages", self.configs["pages"]),
-            )
-
-            small_df = self.get_table_data(
-                self.configs.get("small_table_areas"),
-                self.configs.get("small_columns"),
-                self.configs.get("small_fix", True),
-                flavor=self.configs.get("small_flavor", self.configs["flavor"]),
-                pages=self.configs.get("small_pages", self.configs["pages"]),
-            )
+            regions = {
+                "header": {
+                    "table_areas": self.configs.get("header_table_areas"),
+                    "table_columns": self.configs.get("header_columns"),
+                    "fix_header": self.configs.get("header_fix", True),
+                    "flavor": self.configs.get("header_flavor", self.configs["flavor"]),
+                    "pages": self.configs.get("header_pages", self.configs["pages"]),
+                },
+                "main": {
+                    "table_areas": self.configs.get("table_areas"),
+                    "table_columns": self.configs.get("columns"),
+                    "fix_header": self.configs.get("fix", True),
+                    "flavor": self.configs.get("main_flavor", self.configs["flavor"]),
+                    "pages": self.configs.get("main_pages", self.configs["pages"]),
+                },
+                "small": {
+                    "table_areas": self.configs.get("small_table_areas"),
+                    "table_columns": self.configs.get("small_columns"),
+                    "fix_header": self.configs.get("small_fix", True),
+                    "flavor": self.configs.get("small_flavor", self.configs["flavor"]),
+                    "pages": self.configs.get("small_pages", self.configs["pages"]),
+                },
+            }
+            tables = self.get_tables_data(regions)
+            header_df = tables["header"]
+            main_df = tables["main"]
+            small_df = tables["small"]
             logger.info("Table extraction complete.")
 
+            insertion_date = pd.Timestamp("today").normalize()
+
             if main_df is None or main_df.empty:
                 logger.warning(
                     "No main table data extracted. Skipping further processing for main."
                 )
             else:
                 logger.info("Adding header info and insertion date to main data...")
-                main_df = self.add_header_info(header_df, main_df)
+                main_df = self.add_header_info(header_df, main_df, insertion_date)
 
                 logger.info("Sanitizing main table column names...")
                 main_df = self.sanitize_column_names(main_df)
@@ -104,7 +135,7 @@ class PDFTableExtractor:
                 )
             else:
                 logger.info("Adding header info and insertion date to small data...")
-                small_df = self.add_header_info(header_df, small_df)
+                small_df = self.add_header_info(header_df, small_df, insertion_date)
 
                 if self.configs.get("small_sanitize", True):
                     logger.info("Sanitizing small table column names...")
@@ -131,7 +162,7 @@ class PDFTableExtractor:
             )
             return False
         finally:
-            if file_downloaded and os.path.exists(self.download_path):
+            if self.download_path and os.path.exists(self.download_path):
                 try:
                     os.remove(self.download_path)
                     logger.info(f"Cleaned up downloaded file: {self.download_path}")
@@ -140,23 +171,199 @@ class PDFTableExtractor:
                         f"Error removing downloaded file {self.download_path}: {e}"
                     )
 
+    @staticmethod
+    def run_batch(
+        file_names: list[str], configs: dict, max_workers: int | None = None
+    ) -> list[bool]:
+        """
+        Runs the extraction pipeline for many PDFs on a process pool.
+
+        Each worker process downloads, extracts and loads whole files, so S3
+        and database I/O of some files overlaps with Camelot parsing of
+        others. Workers reuse their own shared SQLAlchemy engine across files.
+
+        Args:
+            file_names: The S3 keys of the PDF files.
+            configs: The extraction configuration applied to every file.
+            max_workers: Number of worker processes. Defaults to the CPU count.
+
+        Returns:
+            The result of `start` for each file, in the same order as `file_names`.
+        """
+        if not file_names:
+            return []
+
+        max_workers = min(max_workers or os.cpu_count() or 1, len(file_names))
+        logger.info(
+            f"Processing {len(file_names)} files with {max_workers} worker processes."
+        )
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=setup_logger,
+            initargs=(False,),
+        ) as executor:
+            return list(
+                executor.map(_process_one, file_names, [configs] * len(file_names))
+            )
+
     def download_file(self):
         """
-        Downloads the PDF file from the configured AWS S3 bucket.
-        Creates the local download directory if it doesn't exist.
+        Downloads the PDF file from the configured AWS S3 bucket into a
+        temporary file, on tmpfs when available. The file is removed by `start`.
+
+        Raises:
+            ValueError: If AWS_BUCKET is not set.
+            FileNotFoundError: If the download fails.
         """
-        bucket = os.getenv("AWS_BUCKET")
+        bucket = session.AWS_BUCKET
         if not bucket:
             raise ValueError("AWS_BUCKET environment variable not set.")
 
-        if not os.path.exists(DOWNLOAD_DIR):
-            os.makedirs(DOWNLOAD_DIR, exist_ok=True)
-            logger.info(f"Created download directory: {DOWNLOAD_DIR}")
+        fd, self.download_path = tempfile.mkstemp(suffix=".pdf", dir=TEMP_DIR)
+        os.close(fd)
 
         logger.info(
             f"Attempting to download file '{self.file_name}' from S3 bucket '{bucket}' to '{self.download_path}'"
         )
-        self.aws.download_file_from_s3(bucket, self.file_name, self.download_path)
+        if not self.aws.download_file_from_s3(
+            bucket, self.file_name, self.download_path
+        ):
+            raise FileNotFoundError(
+                f"Could not download '{self.file_name}' from S3 bucket '{bucket}'."
+            )
+
+    def get_tables_data(self, regions: dict) -> dict:
+        """
+        Extracts the table data of several regions of the downloaded PDF.
+
+        Regions read with the 'stream' flavor from the same pages share a
+        single Camelot pass: their table areas are passed together to
+        `camelot.read_pdf`, so each page is parsed once, and the resulting
+        tables are split back by area. Other regions are read one by one
+        with `get_table_data`.
+
+        Args:
+            regions: A dictionary mapping a region name to the keyword
+                     arguments of `get_table_data` for that region.
+
+        Returns:
+            A dictionary mapping each region name to its DataFrame, or None
+            if no tables were found for it.
+        """
+        password = self.configs.get("password")
+        groups = {}
+        for name, region in regions.items():
+            groups.setdefault((region["flavor"], region["pages"]), []).append(name)
+
+        results = {}
+        for (_, pages), names in groups.items():
+            group = {name: regions[name] for name in names}
+            if len(group) > 1 and self._can_share_pass(group):
+                results.update(self._get_grouped_table_data(group, pages, password))
+            else:
+                for name, region in group.items():
+                    results[name] = self.get_table_data(**region, password=password)
+        return results
+
+    @staticmethod
+    def _can_share_pass(group: dict) -> bool:
+        """
+        Checks whether the regions of a group can be read in one Camelot pass.
+
+        That requires the 'stream' flavor, explicit table areas that are all
+        distinct, and a column list per area whenever columns are given.
+        """
+        bboxes = set()
+        for region in group.values():
+            areas = region["table_areas"]
+            columns = region["table_columns"]
+            if region["flavor"] != "stream" or not areas:
+                return False
+            if columns is not None and len(columns) != len(areas):
+                return False
+            try:
+                bboxes.update(bbox_from_str(area) for area in areas)
+            except ValueError:
+                return False
+        return len(bboxes) == sum(len(r["table_areas"]) for r in group.values())
+
+    def _get_grouped_table_data(
+        self, group: dict, pages: str, password: str | None
+    ) -> dict:
+        """
+        Reads all regions of a group with a single `camelot.read_pdf` call.
+
+        Camelot sorts the areas of a page from top to bottom and matches
+        column lists by that position, so the areas are sorted the same way
+        before the call. Tables are mapped back to their region by bounding
+        box. If the combined pass fails, e.g. because one area has no text,
+        the regions are read separately so one region cannot fail the others.
+
+        Returns:
+            A dictionary mapping each region name to its DataFrame, or None
+            if no tables were found for it.
+        """
+        if not self.download_path or not os.path.exists(self.download_path):
+            logger.error(f"PDF file not found for extraction: {self.download_path}")
+            return dict.fromkeys(group)
+
+        entries = []
+        for name, region in group.items():
+            columns = region["table_columns"] or [""] * len(region["table_areas"])
+            for area, column in zip(region["table_areas"], columns):
+                entries.append((bbox_from_str(area), area, column, name))
+        entries.sort(key=lambda entry: entry[0][1], reverse=True)
+
+        has_columns = any(region["table_columns"] for region in group.values())
+        logger.info(
+            f"Extracting table data for regions {list(group)} in one pass with "
+            f"flavor='stream', pages='{pages}'"
+        )
+
+        try:
+            tables = camelot.read_pdf(
+                self.download_path,
+                flavor="stream",
+                strip_text=self.configs.get("strip_text"),
+                pages=pages,
+                password=password,
+                table_areas=[area for _, area, _, _ in entries],
+                columns=(
+                    [column for _, _, column, _ in entries] if has_columns else None
+                ),
+            )
+            logger.info(f"Camelot found {tables.n} tables.")
+        except Exception as e:
+            logger.warning(
+                f"Combined table extraction failed ({e}). Reading regions separately."
+            )
+            return {
+                name: self.get_table_data(**region, password=password)
+                for name, region in group.items()
+            }
+
+        region_by_bbox = {bbox: name for bbox, _, _, name in entries}
+        region_tables = {name: [] for name in group}
+        for table in tables:
+            region_tables[region_by_bbox[table._bbox]].append(table)
+
+        results = {}
+        for name, region_table_list in region_tables.items():
+            if not region_table_list:
+                logger.warning(f"No tables detected by Camelot for region '{name}'.")
+                results[name] = None
+                continue
+            try:
+                results[name] = self.tables_to_dataframe(
+                    region_table_list, group[name]["fix_header"]
+                )
+            except Exception as e:
+                logger.exception(
+                    f"An unexpected error occurred during table extraction: {e}"
+                )
+                results[name] = None
+        return results
 
     def get_table_data(
         self,
@@ -187,7 +394,7 @@ class PDFTableExtractor:
             A pandas DataFrame containing the extracted and potentially
             header-fixed table data, or None if no tables were found.
         """
-        if not os.path.exists(self.download_path):
+        if not self.download_path or not os.path.exists(self.download_path):
             logger.error(f"PDF file not found for extraction: {self.download_path}")
             return None
 
@@ -202,21 +409,6 @@ class PDFTableExtractor:
                 "pages": pages,
                 "password": password,
             }
-            if flavor == "stream":
-                if table_columns:
-                    camelot_args["columns"] = table_columns
-                if table_areas:
-                    camelot_args["table_areas"] = table_areas
-
-            elif flavor == "lattice":
-                if table_areas:
-                    camelot_args["table_areas"] = table_areas
-            camelot_args = {
-                "flavor": flavor,
-                "strip_text": self.configs.get("strip_text"),
-                "pages": pages,
-                "password": password,
-            }
             if table_areas is not None:
                 camelot_args["table_areas"] = table_areas
             if table_columns is not None:
@@ -229,22 +421,7 @@ class PDFTableExtractor:
                 logger.warning("No tables detected by Camelot for these settings.")
                 return None
 
-            table_content_list = []
-            for page_index, table in enumerate(tables):
-                df = table.df
-                if fix_header:
-                    logger.debug(
-                        f"Fixing header for table from page {table.page}, index {page_index}..."
-                    )
-                    df = self.fix_header(df)
-                table_content_list.append(df)
-
-            if not table_content_list:
-                return None
-
-            result_df = pd.concat(table_content_list, ignore_index=True)
-            logger.info(f"Concatenated table data shape: {result_df.shape}")
-            return result_df
+            return self.tables_to_dataframe(tables, fix_header)
 
         except ValueError as ve:
             logger.exception(f"ValueError during table extraction: {ve}")
@@ -255,8 +432,45 @@ class PDFTableExtractor:
             )
             return None
 
+    def tables_to_dataframe(self, tables, fix_header: bool) -> pd.DataFrame | None:
+        """
+        Concatenates the DataFrames of Camelot tables into one DataFrame.
+
+        Args:
+            tables: The Camelot tables, in page order.
+            fix_header: If True, fixes the header of each table with `fix_header`.
+
+        Returns:
+            The concatenated DataFrame, or None if there are no tables.
+        """
+        table_content_list = []
+        for page_index, table in enumerate(tables):
+            df = table.df
+            if fix_header:
+                logger.debug(
+                    "Fixing header for table from page {}, index {}...",
+                    table.page,
+                    page_index,
+                )
+                df = self.fix_header(df)
+            table_content_list.append(df)
+
+        if not table_content_list:
+            return None
+
+        # A single table is returned as is; concat would only copy it.
+        if len(table_content_list) == 1:
+            result_df = table_content_list[0]
+        else:
+            result_df = pd.concat(table_content_list, ignore_index=True)
+        logger.info(f"Concatenated table data shape: {result_df.shape}")
+        return result_df
+
     def add_header_info(
-        self, header_df: pd.DataFrame | None, content_df: pd.DataFrame
+        self,
+        header_df: pd.DataFrame | None,
+        content_df: pd.DataFrame,
+        insertion_date: pd.Timestamp | None = None,
     ) -> pd.DataFrame:
         """
         Adds information from the header DataFrame as new columns to the
@@ -266,15 +480,20 @@ class PDFTableExtractor:
             header_df: A pandas DataFrame containing the header information
                        (expected to have one relevant row after fixing). Can be None.
             content_df: The pandas DataFrame containing the main or small table data.
+            insertion_date: The value of the 'Insertion Date' column. Defaults to
+                            today; `start` passes one value for all tables of a file.
 
         Returns:
             The content DataFrame with header information columns and 'Insertion Date'.
         """
+        if insertion_date is None:
+            insertion_date = pd.Timestamp("today").normalize()
+
         if header_df is None or header_df.empty:
             logger.warning(
                 "Header DataFrame is empty or None. Cannot add header info to content."
             )
-            content_df["insertion_date"] = pd.Timestamp("today").normalize()
+            content_df["insertion_date"] = insertion_date
             return content_df
 
         if content_df.empty:
@@ -285,16 +504,11 @@ class PDFTableExtractor:
 
         header_info_row = header_df.iloc[0]
 
-        header_info_df = pd.DataFrame(
-            [header_info_row.values] * len(content_df), columns=header_df.columns
-        )
-
-        combined_df = pd.concat(
-            [content_df.reset_index(drop=True), header_info_df.reset_index(drop=True)],
-            axis=1,
-        )
+        combined_df = content_df.reset_index(drop=True)
+        for column, value in header_info_row.items():
+            combined_df[column] = value
 
-        combined_df["insertion_date"] = pd.Timestamp("today").normalize()
+        combined_df["insertion_date"] = insertion_date
 
         logger.info(
             f"Added header info and insertion date. New shape: {combined_df.shape}"
@@ -334,20 +548,22 @@ class PDFTableExtractor:
 
         new_columns = df.iloc[0].astype(str)
 
-        df = df[1:].copy()
-
-        df.columns = new_columns
-
         if df.shape[1] > 0:
-            col_to_drop = df.columns[0]
-            df = df.drop(columns=[col_to_drop])
-            logger.debug(f"Dropped first column '{col_to_drop}' after fixing header.")
+            col_to_drop = new_columns.iloc[0]
+            # Like drop(columns=[...]), this drops every column with that label.
+            keep = (new_columns != col_to_drop).to_numpy()
+            df = df.iloc[1:, keep]
+            df.columns = new_columns[keep]
+            logger.debug("Dropped first column '{}' after fixing header.", col_to_drop)
         else:
+            df = df[1:]
+            df.columns = new_columns
             logger.warning(
                 "DataFrame has no columns after setting header. Cannot drop first column."
             )
 
-        df = df.reset_index(drop=True)
+        # The slice above is the only copy; the index is replaced in place.
+        df.index = pd.RangeIndex(len(df))
 
         logger.debug("Header fixing complete.")
         return df
@@ -368,17 +584,13 @@ class PDFTableExtractor:
             return df
 
         original_columns = list(df.columns)
-        new_columns = []
-        for col in original_columns:
-            col_str = str(col)
-            col_str = unidecode(col_str)
-            col_str = col_str.replace(" ", "_")
-            col_str = pd.Series(col_str).str.replace(r"[^\w]+", "", regex=True).iloc[0]
-            col_str = col_str.lower()
-            new_columns.append(col_str)
+        new_columns = [
+            _NON_WORD_CHARS.sub("", unidecode(str(col)).replace(" ", "_")).lower()
+            for col in original_columns
+        ]
 
         df.columns = new_columns
-        logger.debug(f"Sanitized columns: {original_columns} -> {new_columns}")
+        logger.debug("Sanitized columns: {} -> {}", original_columns, new_columns)
         return df
 
     def send_to_db(self, df: pd.DataFrame, table_name: str):
@@ -399,8 +611,14 @@ class PDFTableExtractor:
             f"Connecting to database and attempting to save data to table: {table_name}"
         )
         try:
-            connection = RDSPostgreSQLManager().alchemy()
-            df.to_sql(table_name, connection, if_exists="append", index=False)
+            df.to_sql(
+                table_name,
+                get_engine(),
+                if_exists="append",
+                index=False,
+                method=copy_insert,
+                chunksize=COPY_CHUNK_SIZE,
+            )
             logger.success(
                 f"Successfully saved {len(df)} rows to database table: {table_name}"
             )